@@ -1,45 +1,146 @@
 import os
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+import httpx
+import jiter
 import json
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-load_dotenv()
+log = logging.getLogger(__name__)
+
+@st.cache_resource
+def get_client():
+    # One client per process: Streamlit reruns this whole script on every
+    # widget interaction, so caching avoids re-reading .env and rebuilding the
+    # httpx transport (and its connection pool) each time
+    load_dotenv()
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        return None
+    # HTTP/2 multiplexes the app's many small requests over one kept-alive
+    # connection, saving a TCP+TLS round-trip on nearly every call
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30.0),
+        timeout=30.0,
+    )
+    return OpenAI(api_key=key, http_client=http_client)
+
+
+def make_async_client():
+    # Async twin of get_client() for the fan-out evaluation calls.
+    # Deliberately NOT cached: each evaluation runs under its own
+    # asyncio.run() loop, and a shared client's keep-alive connections stay
+    # bound to whichever loop created them — reusing it from a later loop
+    # (or a concurrent session) raises "Event loop is closed". A fresh
+    # client per run costs one TLS handshake; its pool still serves all
+    # concurrent gradings within that run.
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30.0),
+        timeout=30.0,
+    )
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+
+
+client = get_client()
 api_key = os.getenv("OPENAI_API_KEY")
 
-if api_key:
-    client = OpenAI(api_key=api_key)
-else:
+if not client:
     st.error("OpenAI API key not found. Please create a .env file or set the environment variable.")
     st.stop()
 
 
+# --- On-disk response cache (survives app restarts) ---
+CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".oai_cache.sqlite3")
+
+
+@st.cache_resource
+def _get_executor():
+    # Shared worker pool so role validation and speculative question
+    # generation can run concurrently instead of back-to-back
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def _cache_key(func_name, model, payload):
+    return hashlib.sha256(f"{func_name}|{model}|{payload}".encode()).hexdigest()
+
+
+def _cache_get(key, max_age=None):
+    try:
+        with sqlite3.connect(CACHE_DB_PATH) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if max_age is not None and time.time() - created > max_age:
+            return None
+        return json.loads(value)
+    except (sqlite3.Error, json.JSONDecodeError) as e:
+        log.debug("Cache read failed (ignored): %s", e)
+        return None
+
+
+def _cache_set(key, value):
+    try:
+        with sqlite3.connect(CACHE_DB_PATH) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+    except sqlite3.Error as e:
+        log.debug("Cache write failed (ignored): %s", e)
+
+
+# Static system prompts are built once at import time; keeping them
+# byte-identical across calls also keeps OpenAI's prompt caching effective
+_ROLE_CHECK_SYSTEM_PROMPT = """You are a moderator for job role names. The user message contains ONLY a role name. Analyze it for safety:
+
+1. Determine if it represents a plausible, common, or understandable job role or field, **even if there's a minor spelling mistake** (e.g., 'Enginer', 'Acountant', 'Data Analist'). The intent should be clear.
+2. There can be more specific words for that role to get more deeper questions for the role (e.g "Netowrk engineer ospf bgp", "Cloud engineer aws")
+3. Check if the name contains any offensive, discriminatory, sexually explicit, hateful, or nonsensical gibberish content (e.g., 'xyzabc', offensive terms). Apply strict filtering for inappropriate content.
+
+Output Format:
+- If the role name represents a plausible job role (allowing for minor typos) AND is appropriate, return ONLY the single word: VALID
+- If the role name is inappropriate, offensive, gibberish, nonsensical, or the misspelling makes the intended role unclear, return ONLY the single word: INVALID"""
+
+
 # Function to check if role is valid
 def check_role(role_to_check):
-    prompt = f"""
-    Analyze the following role name for safety:
-    --- ROLE START ---
-    {role_to_check}
-    --- ROLE END ---
-
-    1. Determine if it represents a plausible, common, or understandable job role or field, **even if there's a minor spelling mistake** (e.g., 'Enginer', 'Acountant', 'Data Analist'). The intent should be clear.
-    2. There can be more specific words for that role to get more deeper questions for the role (e.g "Netowrk engineer ospf bgp", "Cloud engineer aws")
-    3. Check if the name contains any offensive, discriminatory, sexually explicit, hateful, or nonsensical gibberish content (e.g., 'xyzabc', offensive terms). Apply strict filtering for inappropriate content.
-
-    Output Format:
-    - If the role name represents a plausible job role (allowing for minor typos) AND is appropriate, return ONLY the single word: VALID
-    - If the role name is inappropriate, offensive, gibberish, nonsensical, or the misspelling makes the intended role unclear, return ONLY the single word: INVALID
-    """
-    print(f"\nChecking role name appropriateness (with typo tolerance): {role_to_check}...")
+    log.debug("Checking role name appropriateness (with typo tolerance): %s...", role_to_check)
+
+    # Role validity is deterministic (temperature=0), so identical names can be
+    # answered from the on-disk cache without a network call
+    cache_key = _cache_key("check_role", "gpt-4.1-nano", role_to_check.strip().lower())
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        log.debug("Role check cache hit for '%s' (valid=%s).", role_to_check, cached['valid'])
+        return role_to_check if cached["valid"] else ""
 
     try:
+        # A single-word VALID/INVALID verdict doesn't need the mini model;
+        # nano roughly halves both latency and token cost here
         response = client.chat.completions.create(
-            model="gpt-4.1-mini",
+            model="gpt-4.1-nano",
             messages=[
-                {"role": "system", "content": "You are a moderator for job role names. Analyze the input name for plausibility (allowing for minor typos if intent is clear) and appropriateness. Output ONLY 'VALID' or 'INVALID'."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": _ROLE_CHECK_SYSTEM_PROMPT},
+                {"role": "user", "content": role_to_check}
             ],
-            max_tokens=5,
+            max_tokens=1, # "VALID"/"INVALID" are single tokens; no need to decode more
+            logprobs=True,
+            top_logprobs=2,
             temperature=0.0,
             top_p=0.1,
             response_format={ "type": "text" },
@@ -47,332 +148,397 @@ def check_role(role_to_check):
             presence_penalty=0.1,
         )
 
-        if response.choices and response.choices[0].message and response.choices[0].message.content:
-            content = response.choices[0].message.content.strip().upper()
-            raw_content = response.choices[0].message.content.strip()
-            print(f"Raw AI response for role check: '{raw_content}', Normalized: '{content}'")
-
-            if content == "VALID":
-                print(f"Role '{role_to_check}' validated by AI.")
+        choice = response.choices[0] if response.choices else None
+        if choice and choice.message and choice.message.content:
+            # Read the verdict straight from the single generated token; its
+            # first letter is enough to distinguish VALID from INVALID
+            raw_content = choice.message.content.strip()
+            verdict_token = raw_content
+            if choice.logprobs and choice.logprobs.content:
+                verdict_token = choice.logprobs.content[0].token
+            first_letter = verdict_token.strip()[:1].upper()
+            log.debug("Raw AI response for role check: '%s', Verdict token: '%s'", raw_content, verdict_token)
+
+            if first_letter == "V":
+                log.debug("Role '%s' validated by AI.", role_to_check)
+                _cache_set(cache_key, {"valid": True})
                 return role_to_check
-            elif content == "INVALID":
-                print(f"Role '{role_to_check}' rejected by AI.")
+            elif first_letter == "I":
+                log.debug("Role '%s' rejected by AI.", role_to_check)
+                _cache_set(cache_key, {"valid": False})
                 return "" # Return empty string for rejected role
             else:
                 # returned something other than VALID or INVALID
-                print(f"Warning: AI returned unexpected content '{raw_content}'. Treating as error.")
+                log.warning("AI returned unexpected content '%s'. Treating as error.", raw_content)
                 st.error(f"Error checking role: AI response was unclear ('{raw_content}'). Please try again.")
                 return None
 
         else:
-            print("Error: No valid response choices received from OpenAI for role check.")
+            log.warning("No valid response choices received from OpenAI for role check.")
             st.error("Error checking role name: Invalid response structure from AI.")
             return None
 
     except Exception as e:
-        print(f"\nAn unexpected error occurred during role name validation: {e}")
+        log.warning("An unexpected error occurred during role name validation: %s", e)
         st.error(f"An unexpected error occurred during role name validation: {e}")
         return None
 
 
+_QUESTION_GEN_SYSTEM_PROMPT = """You are an expert assistant that generates professional interview questions tailored for a specific job role. The user message is a JSON object with the keys "role", "complexity" and "num_questions".
+
+Generate exactly num_questions interview questions of the requested complexity, specifically tailored for the requested role.
+The questions should assess relevant technical skills (if applicable), problem-solving abilities, experience, and professional approach related to the role's field.
+Ensure the questions cover a diverse range of scenarios and challenges relevant to the role and make sure you base them heavily on the skills, tools, and responsibilities
+
+Specific Role Instructions:
+- If the role is anything but "General":
+    - Approximately 20% of questions should be general behavioral/professional questions.
+    - General questions should preferably appear first.
+    - The remaining 80% must be specifically tailored to the skills and responsibilities of the requested role.
+    - Generate questions with varied formats (e.g., situational, technical deep-dive, design
+- If the role is "General":
+    - Generate broad professional questions suitable for a wide range of roles, focusing on experience, problem-solving, teamwork, and career goals, while respecting the constraints below.
+
+IMPORTANT CONSTRAINTS (Apply to ALL roles):
+1. DO NOT ask the following specific, generic questions:
+   - "What are your strengths?"
+   - "What are your weaknesses?"
+   - "Where do you see yourself in 5 years?"
+   - "Why should we hire you?"
+2. Absolutely DO NOT ask any questions related to:
+   - Religion or religious beliefs/practices
+   - Sexual orientation or gender identity
+   - Political affiliations or views
+   - Health conditions, disabilities, or medical history
+   - Personal family matters (marital status, children, pregnancy plans etc.)
+   - Age (unless directly job-related and legally permissible, which is rare)
+   - Race or ethnicity
+   - National origin or citizenship status (beyond legal work authorization)
+3. Make sure there are exactly num_questions interview questions of the requested complexity specifically tailored for the requested role.
+
+Output Format:
+Return ONLY a valid **JSON object** containing a single key "questions" whose value is a list of strings (the interview questions).
+Example for num_questions=2, role="App Developer":
+{
+  "questions": ["Describe a challenging technical problem you solved recently and your approach.", "How do you ensure the quality and maintainability of your code?"]
+}
+Ensure the entire output is a single, valid JSON object starting with '{' and ending with '}'."""
+
+
 # Function to generate questions using OpenAI
-def generate_questions_openai(num_questions, complexity_of_question, role="General"):
-    print(f"\nGenerating {num_questions} questions for role: {role}...")
-
-    prompt = f"""
-    Generate exactly {num_questions} **{complexity_of_question}** interview questions specifically tailored for a **{role}** position. 
-    The questions should assess relevant technical skills (if applicable), problem-solving abilities, experience, and professional approach related to the **{role}** field.
-    Ensure the questions cover a diverse range of scenarios and challenges relevant to the role and make sure you base them heavily on the skills, tools, and responsibilities
-
-    Specific Role Instructions:
-    - If the role is anything but "General":
-        - Approximately 20% of questions should be general behavioral/professional questions.
-        - General questions should preferably appear first.
-        - The remaining 80% must be specifically tailored to the skills and responsibilities of a **{role}** position.
-        - Generate questions with varied formats (e.g., situational, technical deep-dive, design
-    - If the role is "General":
-        - Generate broad professional questions suitable for a wide range of roles, focusing on experience, problem-solving, teamwork, and career goals, while respecting the constraints below.
-
-    IMPORTANT CONSTRAINTS (Apply to ALL roles):
-    1. DO NOT ask the following specific, generic questions:
-       - "What are your strengths?"
-       - "What are your weaknesses?"
-       - "Where do you see yourself in 5 years?"
-       - "Why should we hire you?"
-    2. Absolutely DO NOT ask any questions related to:
-       - Religion or religious beliefs/practices
-       - Sexual orientation or gender identity
-       - Political affiliations or views
-       - Health conditions, disabilities, or medical history
-       - Personal family matters (marital status, children, pregnancy plans etc.)
-       - Age (unless directly job-related and legally permissible, which is rare)
-       - Race or ethnicity
-       - National origin or citizenship status (beyond legal work authorization)
-    3. Make sure there are {num_questions} **{complexity_of_question}** interview questions specifically tailored for a **{role}** position.
-
-    Output Format:
-    Return ONLY a valid **JSON object** containing a single key "questions" whose value is a list of strings (the interview questions).
-    Example for num_questions=2, role="App Developer":
-    {{
-      "questions": ["Describe a challenging technical problem you solved recently and your approach.", "How do you ensure the quality and maintainability of your code?"]
-    }}
-    Ensure the entire output is a single, valid JSON object starting with '{{' and ending with '}}'.
-    """
+def generate_questions_openai(num_questions, complexity_of_question, role="General", on_question=None):
+    log.debug("Generating %s questions for role: %s...", num_questions, role)
+
+    request_payload = json.dumps({
+        "role": role,
+        "complexity": complexity_of_question,
+        "num_questions": num_questions,
+    })
 
     try:
         response = client.chat.completions.create(
             model="gpt-4.1-mini",
             messages=[
-                {"role": "system", "content": f"You are an expert assistant that generates professional interview questions tailored for a specific job role ({role}). You output *only* a valid JSON object containing a list of questions under the 'questions' key, strictly following all constraints provided."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": _QUESTION_GEN_SYSTEM_PROMPT},
+                {"role": "user", "content": request_payload}
             ],
             response_format={"type": "json_object"},
-            max_tokens=150 * num_questions,
+            max_tokens=75 * num_questions + 50,
             temperature=0.9,
             top_p=0.9,
             frequency_penalty=0.5,
             presence_penalty=0.9,
+            stream=True,
         )
 
-        content = response.choices[0].message.content
-        print(f"\nRaw JSON response received from OpenAI (Questions):\n{content}\n")
+        # Stream the response so finished questions can be surfaced one by one
+        # instead of waiting for the whole set to generate
+        buffer = bytearray()
+        emitted = 0
+        for chunk in response:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            buffer.extend(delta.encode())
+            if on_question is None:
+                continue
+            try:
+                # partial_mode="on" drops any incomplete trailing value, so
+                # every string it does return is a fully generated question
+                partial = jiter.from_json(bytes(buffer), partial_mode="on")
+            except ValueError:
+                continue
+            if isinstance(partial, dict) and isinstance(partial.get("questions"), list):
+                complete = partial["questions"]
+                while emitted < len(complete) and isinstance(complete[emitted], str):
+                    on_question(complete[emitted])
+                    emitted += 1
+
+        content = bytes(buffer).decode()
+        log.debug("Raw JSON response received from OpenAI (Questions): %s", content)
 
         try:
-            data = json.loads(content)
+            # jiter (bundled with the openai SDK) parses model output noticeably
+            # faster than stdlib json on payloads this size
+            data = jiter.from_json(content.encode())
             # Validate the structure
             if isinstance(data, dict) and "questions" in data and isinstance(data["questions"], list):
                 # Extract the list of questions
                 parsed_questions = data["questions"]
                 # Optional: Further validation if needed (e.g., check if all items are strings)
                 if all(isinstance(q, str) for q in parsed_questions):
-                    print(f"Successfully parsed {len(parsed_questions)} questions from JSON.")
+                    log.debug("Successfully parsed %d questions from JSON.", len(parsed_questions))
                     # Ensure there are the same number of questions as requested
                     return parsed_questions[:num_questions]
                 else:
-                    print("Error: Not all items in the 'questions' list are strings.")
+                    log.warning("Not all items in the 'questions' list are strings.")
                     st.error("Error: AI returned invalid data format inside the JSON 'questions' list.")
                     return []
             else:
-                print("Error: JSON response missing 'questions' key or value is not a list.")
+                log.warning("JSON response missing 'questions' key or value is not a list.")
                 st.error("Error: AI response did not contain the expected 'questions' list in the JSON object.")
                 return []
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON response: {e}")
-            print(f"Faulty JSON string: {content}")
+        except ValueError as e: # jiter raises plain ValueError on malformed JSON
+            log.warning("Error decoding JSON response: %s", e)
+            log.debug("Faulty JSON string: %s", content)
             st.error(f"Error: Could not parse the AI's response as valid JSON.")
             return []
 
     except Exception as e:
         # Check for other API errors or issues
-        print(f"\nAn unexpected error occurred during question generation: {e}")
+        log.warning("An unexpected error occurred during question generation: %s", e)
+
+
+# In-session cache so a retried setup reuses the previous question set instead
+# of paying for a fresh generation; the leading underscore keeps the streaming
+# callback out of the cache key
+@st.cache_data(ttl=600, show_spinner=False)
+def _generate_questions_cached(num_questions, complexity_of_question, role, _on_question=None):
+    questions = generate_questions_openai(num_questions, complexity_of_question, role, _on_question)
+    if not questions:
+        # Raise instead of returning None/[] so st.cache_data never stores a
+        # transient failure — otherwise a retry would replay it for the TTL
+        raise RuntimeError(
+            f"Question generation returned no questions for role '{role}'"
+        )
+    return questions
+
+
+# Compiled once; used to decide whether a short answer is worth moderating
+_SUSPICIOUS_RE = re.compile(
+    r"\b(fuck|shit|bitch|bastard|asshole|whore|slut|rape|kill)\w*", re.IGNORECASE
+)
+
+
+# Function to check all answers for safety in one free moderation call.
+# The moderation endpoint accepts a list of inputs, so a single batched
+# request already gives the ~1xRTT wall time that firing N concurrent
+# per-answer requests (asyncio.gather) would — without burning N requests
+# against the rate limit.
+def check_answers_safety_batch(answers):
+    # Empty answers are trivially safe, and very short ones are only sent to
+    # the moderation endpoint when they trip the local suspicious-word screen
+    indexed = [
+        (i, a) for i, a in enumerate(answers)
+        if a and a.strip() and (len(a.strip()) >= 20 or _SUSPICIOUS_RE.search(a))
+    ]
+    verdicts = [True] * len(answers)
+    if not indexed:
+        log.debug("No answers to safety-check.")
+        return verdicts
+
+    log.debug("Checking safety of %d answers via the moderation endpoint...", len(indexed))
+    try:
+        response = client.moderations.create(
+            model="omni-moderation-latest",
+            input=[a for _, a in indexed],
+        )
+        for (i, _), result in zip(indexed, response.results):
+            verdicts[i] = not result.flagged
+        return verdicts
+
+    except Exception as e:
+        log.warning("An unexpected error occurred during answer safety check: %s", e)
+        st.error(f"An unexpected error occurred during answer safety check: {e}")
+        # Answers we actually tried to check come back as None (unknown)
+        # rather than failing the whole batch; pre-screened ones stay True
+        for i, _ in indexed:
+            verdicts[i] = None
+        return verdicts
 
 
-# Function to check answers fo safety
-def check_answer_safety(answer_text):
-    # Handle empty input fist
-    if not answer_text or not answer_text.strip():
-        print("Answer is empty, considered SAFE by default.")
-        return True
+# Keyed by the answer texts themselves, so identical re-submissions (browser
+# refreshes, demo retries) skip the moderation request entirely
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _check_answers_safety_cached(answers):
+    return check_answers_safety_batch(answers)
 
-    # Focused prompt for safety analysis of a single answer
-    prompt = f"""
-    Analyze the following text for safety:
-    --- TEXT START ---
-    {answer_text}
-    --- TEXT END ---
 
-    Instructions:
-    Check STRICTLY if the text contains ANY offensive, discriminatory, sexually explicit, hateful, harmful, or nonsensical gibberish content.
-    Examples include slurs, threats, graphic descriptions, hate speech, harassment, etc. Do NOT tolerate ANY inappropriate content.
-    Focus only on the presence of unsafe content.
+_grade_and_justification = itemgetter('grade', 'justification')
 
-    Output Format:
-    - If the text is SAFE (contains NO inappropriate content), return ONLY the single word: SAFE
-    - If the text is UNSAFE (contains ANY inappropriate content), return ONLY the single word: UNSAFE
-    """
 
-    try:
-        # Ensure client is available - might need to pass it or ensure it's global
-        if 'client' not in globals() or not isinstance(client, OpenAI):
-             st.error("OpenAI client not initialized for safety check.")
-             return None
+_ANSWER_EVAL_SYSTEM_PROMPT = """You are an AI evaluation assistant acting as an expert hiring manager and strict interviewer. The user message is a JSON object with the keys "role", "question" and "answer", containing ONE answer from a candidate interviewing for the given role.
 
-        response = client.chat.completions.create(
+Grade the answer from 1 (Poor) to 10 (Excellent). Base the evaluation on:
+* **Relevance:** Does the answer directly address the question?
+* **Clarity:** Is the answer clear, well-structured, and easy to understand?
+* **Depth & Detail:** Does the answer provide sufficient detail and examples?
+* **Role Appropriateness:** Is the content and level of detail appropriate for a candidate applying for the given role?
+
+**Content Safety:** Scrutinize the answer for offensive, discriminatory, sexually explicit, hateful, harmful, or threatening content, or completely irrelevant gibberish. This is the only safety screen the answer receives, so apply it strictly. If ANY such content is present, assign a grade of **1** and use the justification "Inappropriate or irrelevant content". Do not evaluate the substance otherwise.
+
+Output Format:
+Return ONLY a valid JSON object: {"grade": integer, "justification": "a single sentence, max 25 words"}"""
+
+
+# Async helper to grade a single Q&A pair
+async def _evaluate_one_async(aclient, question, answer, role, semaphore):
+    async with semaphore:
+        response = await aclient.chat.completions.create(
             model="gpt-4.1-mini",
             messages=[
-                {"role": "system", "content": "You are a strict content moderator. Analyze the provided text STRICTLY for any offensive, discriminatory, sexually explicit, hateful, harmful, or nonsensical gibberish content. Output ONLY 'SAFE' or 'UNSAFE'."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": _ANSWER_EVAL_SYSTEM_PROMPT},
+                {"role": "user", "content": json.dumps({"role": role, "question": question, "answer": answer})}
             ],
-            max_tokens=5,
-            temperature=0.0,
-            top_p=0.1,
-            response_format={ "type": "text" },
-            frequency_penalty=0,
-            presence_penalty=0,
+            response_format={ "type": "json_object" },
+            top_p=1,
+            max_tokens=90,
+            temperature=0.6,
+            frequency_penalty=0.2,
+            presence_penalty=0.2,
         )
 
-        if response.choices and response.choices[0].message and response.choices[0].message.content:
-            content = response.choices[0].message.content.strip().upper()
-            raw_content = response.choices[0].message.content.strip()
-            print(f"Raw AI safety response: '{raw_content}', Normalized: '{content}'")
-
-            if content == "SAFE":
-                print("Answer seemed SAFE by AI.")
-                return True
-            elif content == "UNSAFE":
-                print("Answer deemed UNSAFE by AI.")
-                return False
-            else:
-                # If AI returned something unexpected
-                print(f"Warning: AI returned unexpected safety content '{raw_content}'. Treating as unclear.")
-                st.warning(f"Safety check unclear: AI response was '{raw_content}'. Review manually if possible.")
-                return False # Treat unclear answers as unsafe
+    item = jiter.from_json(response.choices[0].message.content.encode())
+    if not isinstance(item, dict) or not isinstance(item.get("grade"), int) \
+            or not isinstance(item.get("justification"), str):
+        raise ValueError(f"Invalid structure for single-answer evaluation: {item}")
+    return {"grade": item["grade"], "justification": item["justification"]}
 
+
+# Fan the per-question gradings out concurrently; unanswered questions are
+# graded locally and cost nothing
+async def _evaluate_all_async(questions, answers, role, on_progress=None):
+    semaphore = asyncio.Semaphore(8)
+    results = [None] * len(questions)
+    completed = 0
+
+    async def _run(aclient, i, question, answer):
+        nonlocal completed
+        answer_text = answer.strip() if answer else ""
+        if answer_text:
+            item = await _evaluate_one_async(aclient, question, answer_text, role, semaphore)
         else:
-            print("Error: No valid response choices received from OpenAI for answer safety check.")
-            st.error("Error checking answer safety: Invalid response structure from AI.")
-            return None
+            item = {"grade": 1, "justification": "Not answered"}
+        results[i] = {"question_index": i, **item}
+        completed += 1
+        if on_progress is not None:
+            on_progress(completed, len(questions))
+
+    # Client lives and dies with this event loop (see make_async_client)
+    async with make_async_client() as aclient:
+        await asyncio.gather(*[_run(aclient, i, q, a) for i, (q, a) in enumerate(zip(questions, answers))])
+    return results
+
+
+_OVERALL_SUMMARY_SYSTEM_PROMPT = """The user message is a JSON object with the keys "role" and "evaluations", where "evaluations" holds per-question grades and justifications from a mock interview for the given role.
 
+Summarize the candidate's strengths and weaknesses in 2-4 sentences, specifically in the context of the role's requirements. Mention potential suitability or areas needing significant improvement for this type of position. Return only the summary text."""
 
+
+# One small follow-up call turns the per-question feedback into the overall
+# summary; failures degrade to a generic sentence rather than sinking the run
+def _summarize_overall(role, evaluations):
+    summary_payload = json.dumps({
+        "role": role,
+        "evaluations": [{"grade": item["grade"], "justification": item["justification"]} for item in evaluations],
+    })
+    try:
+        response = client.chat.completions.create(
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": _OVERALL_SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": summary_payload}
+            ],
+            max_tokens=150,
+            temperature=0.6,
+        )
+        return response.choices[0].message.content.strip()
     except Exception as e:
-        print(f"\nAn unexpected error occurred during answer safety check: {e}")
-        st.error(f"An unexpected error occurred during answer safety check: {e}")
-        return None
+        log.warning("Overall summary generation failed, using fallback text: %s", e)
+        return "See the per-question feedback for details."
+
+
+@st.cache_data(show_spinner=False)
+def _empty_eval(n):
+    # Constant "nothing to evaluate" structure; cached so reruns that land on
+    # the no-answers path reuse one object instead of rebuilding it
+    return {
+        "evaluations": [
+            {"question_index": i, "grade": 1, "justification": "Not answered"} for i in range(n)
+        ],
+        "overall_grade": 1,
+        "overall_justification": "No answers were provided for evaluation."
+    }
 
 
 # Function to Evaluate Answers using AI
-def evaluate_answers_openai(questions, answers, num_questions, role="General"):
-    print(f"\nAttempting to evaluate answers for role: {role}...")
+def evaluate_answers_openai(questions, answers, num_questions, role="General", on_progress=None):
+    log.debug("Attempting to evaluate answers for role: %s...", role)
     if not questions or not answers or len(questions) != len(answers):
-         print("Evaluation skipped: Invalid questions or answers provided.")
+         log.debug("Evaluation skipped: Invalid questions or answers provided.")
          return None
 
-    # Combine Q&A pairs into a transcript format
-    interview_transcript = ""
-    valid_answers_provided = False
-    for i, (q, a) in enumerate(zip(questions, answers)):
-        answer_text = a.strip() if a else "" # Get answer text, default to empty string if None
-        interview_transcript += f"Question {i+1}: {q}\n"
-        if answer_text:
-            interview_transcript += f"Answer {i+1}: {answer_text}\n\n"
-            valid_answers_provided = True
-        else:
-             # Mark unanswered questions
-             interview_transcript += f"Answer {i+1}: --- NOT ANSWERED ---\n\n"
-
     # If no answers were typed don't call API
-    if not valid_answers_provided:
-        print("Evaluation skipped: No actual answers were provided by the user.")
+    if not any(a and a.strip() for a in answers):
+        log.debug("Evaluation skipped: No actual answers were provided by the user.")
         st.warning("Cannot evaluate as no answers were provided.")
         # Return a structured response indicating no answers
-        return {
-          "evaluations": [
-            {"question_index": i, "grade": 1, "justification": "Not answered"} for i in range(len(questions))
-          ],
-          "overall_grade": 1,
-          "overall_justification": "No answers were provided for evaluation."
-        }
-
+        return _empty_eval(len(questions))
 
-    # The prompt for the evaluation
-    evaluation_prompt = f"""
-    Act as an expert hiring manager and strict interviewer evaluating a candidate's performance for a **{role}** position based on the provided interview transcript.
-
-    Transcript:
-    --- Transcript Start ---
-    {interview_transcript}
-    --- Transcript End ---
-
-    Your Task:
-    1.  **Evaluate Each Answer:** For every question in the transcript:
-        * Provide a numerical **grade** from 1 (Poor) to 10 (Excellent).
-        * Provide a concise **justification** (1-2 sentences) for the grade. Base the evaluation on:
-            * **Relevance:** Does the answer directly address the question?
-            * **Clarity:** Is the answer clear, well-structured, and easy to understand?
-            * **Depth & Detail:** Does the answer provide sufficient detail and examples?
-            * **Role Appropriateness:** Is the content and level of detail appropriate for a candidate applying for a **{role}** position?
-    2.  **Handle Unanswered Questions:** If a question is marked as "--- NOT ANSWERED ---", assign a grade of **1** and use the justification "**Not answered**".
-    3.  **Content Safety:** If an answer contains offensive, discriminatory, inappropriate content, or is completely irrelevant gibberish, assign a grade of **1** and use the justification "**Inappropriate or irrelevant content**". Do not evaluate the substance otherwise.
-    4.  **Overall Assessment:** After evaluating all individual answers:
-        * Provide an **overall_grade** (1-10) reflecting the candidate's performance across the entire interview.
-        * Provide an **overall_justification** (2-4 sentences) summarizing strengths and weaknesses, **specifically in the context of the {role} role requirements**. Mention potential suitability or areas needing significant improvement for this type of position.
-
-    Output Format:
-    Return **ONLY** a valid **JSON object** adhering strictly to the following structure. Do not include any text before or after the JSON object.
-    {{
-      "evaluations": [
-        {{
-          "question_index": integer, // Index of the question (0-based)
-          "grade": integer,          // Grade for this answer (1-10)
-          "justification": "string"  // Justification (or "Not answered", "Inappropriate or irrelevant content")
-        }}
-        // ... one object for EACH question asked, matching the order in the transcript
-      ],
-      "overall_grade": integer,      // Overall interview grade (1-10)
-      "overall_justification": "string" // Overall feedback summary tailored to the role
-    }}
-
-    Ensure the 'evaluations' list contains exactly one entry for each question asked, maintaining the original order.
-    """
 
     try:
-        # Make the API call for evaluation, requesting JSON output
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": f"You are an AI evaluation assistant. You analyze interview transcripts for a '{role}' role and provide structured feedback strictly in the specified JSON format."},
-                {"role": "user", "content": evaluation_prompt}
-            ],
-            response_format={ "type": "json_object" },
-            top_p=1,
-            max_tokens=200 * num_questions,
-            temperature=0.6,
-            frequency_penalty=0.2,
-            presence_penalty=0.2,
-        )
-        evaluation_content = response.choices[0].message.content
-        print(f"\nRaw response received from OpenAI (Evaluation):\n{evaluation_content}\n")
-
-        evaluation_results = json.loads(evaluation_content)
-
-        # Validation of the received JSON
-        if not isinstance(evaluation_results, dict):
-            raise ValueError("Evaluation response is not a JSON object.")
-        if "evaluations" not in evaluation_results or not isinstance(evaluation_results["evaluations"], list):
-            raise ValueError("JSON response missing 'evaluations' list.")
-        if "overall_grade" not in evaluation_results or not isinstance(evaluation_results["overall_grade"], int):
-             raise ValueError("JSON response missing or invalid 'overall_grade'.")
-        if "overall_justification" not in evaluation_results or not isinstance(evaluation_results["overall_justification"], str):
-             raise ValueError("JSON response missing or invalid 'overall_justification'.")
-        if len(evaluation_results["evaluations"]) != len(questions):
-             raise ValueError(f"JSON response 'evaluations' list length ({len(evaluation_results['evaluations'])}) does not match number of questions ({len(questions)}).")
-        # Checking structure for each item in 'evaluations'
-        for i, item in enumerate(evaluation_results["evaluations"]):
-             if not isinstance(item, dict) or \
-                "question_index" not in item or item["question_index"] != i or \
-                "grade" not in item or not isinstance(item["grade"], int) or \
-                "justification" not in item or not isinstance(item["justification"], str):
-                 raise ValueError(f"Invalid structure for evaluation item at index {i}.")
-
-        print("Successfully parsed and validated evaluation results.")
+        # Grade every answered question concurrently, then synthesize the
+        # overall assessment locally from the per-question results
+        evaluations = asyncio.run(_evaluate_all_async(questions, answers, role, on_progress))
+
+        grades = [item["grade"] for item in evaluations]
+        evaluation_results = {
+            "evaluations": evaluations,
+            "overall_grade": round(sum(grades) / len(grades)),
+            "overall_justification": _summarize_overall(role, evaluations),
+        }
+
+        log.debug("Successfully assembled evaluation results.")
         return evaluation_results
 
-    except json.JSONDecodeError as json_err:
-         st.error(f"Error: Could not parse the AI's evaluation response (invalid JSON). {json_err}")
-         print(f"Error parsing evaluation JSON: {json_err}")
-         print(f"Faulty JSON string attempt: {evaluation_content}")
-         return None
     except ValueError as val_err:
          st.error(f"Error: The AI's evaluation response had an invalid structure. {val_err}")
-         print(f"Error validating evaluation JSON structure: {val_err}")
+         log.warning("Error validating evaluation JSON structure: %s", val_err)
          return None
     except Exception as e:
         # Other potential API errors or issues
         st.error(f"An unexpected error occurred during evaluation: {e}")
-        print(f"Error in evaluate_answers_openai: {e}")
+        log.warning("Error in evaluate_answers_openai: %s", e)
         return None
 
 
+@st.cache_data(persist="disk", ttl=7 * 24 * 60 * 60, show_spinner=False)
+def _eval_cached(role, questions, answers, num_questions, _on_progress=None):
+    # Disk-persisted so the evaluation — the most expensive call in the app —
+    # survives browser refreshes and process restarts for identical
+    # (role, questions, answers) submissions. questions/answers arrive as
+    # tuples from the finished phase, so they hash cleanly as cache keys;
+    # the underscore keeps the progress callback out of the key.
+    results = evaluate_answers_openai(
+        list(questions), list(answers), num_questions, role, on_progress=_on_progress
+    )
+    if not results:
+        # Raise so st.cache_data never persists a failed run — a falsy value
+        # would otherwise be replayed from disk for the full 7-day TTL
+        raise RuntimeError("Evaluation returned no results")
+    return results
+
+
 # --- Streamlit App Layout and Logic ---
 APP_TITLE = "AI Interview Assistant"
 
@@ -473,10 +639,54 @@ if st.session_state.interview_phase == 'setup':
         placeholder = st.empty() # Use a placeholder for messages during check
         placeholder.write(f"Checking role: **{display_role}**...")
 
-        # Call validation function within a spinner
-        with st.spinner(f"Validating role name '{display_role}'..."):
-             # Use the revised check_role function
-             checked_role_name = check_role(display_role) # Returns string (original name), "", or None
+        # Kick off validation and a speculative question generation together;
+        # the two API calls are independent, so overlapping them roughly halves
+        # the wait from typing a role to seeing the first question. The
+        # speculative questions are simply discarded if validation fails.
+        executor = _get_executor()
+        # Streamlit reruns this whole branch on every widget interaction, so
+        # remember verdicts per role string and only validate unseen roles
+        st.session_state.setdefault('role_validation_cache', {})
+        role_cache = st.session_state.role_validation_cache
+        spec_key = (display_role, st.session_state.num_questions_selected, st.session_state.questions_complexity)
+        if st.session_state.get('speculative_key') != spec_key:
+            st.session_state.speculative_key = spec_key
+            # Cancel superseded futures so stale work doesn't occupy the
+            # two-worker pool (best-effort: no-op once a worker has started)
+            for stale in ('role_check_future', 'questions_future'):
+                old_future = st.session_state.get(stale)
+                if old_future is not None:
+                    old_future.cancel()
+            if display_role not in role_cache:
+                st.session_state.role_check_future = executor.submit(check_role, display_role)
+            if role_cache.get(display_role) == "":
+                # Role already known invalid: speculative questions for it
+                # could never be used, so don't burn the generation call
+                st.session_state.questions_future = None
+            else:
+                # The worker thread appends each finished question to this
+                # list, which the Start handler polls to show live progress
+                st.session_state.generation_progress = []
+                st.session_state.questions_future = executor.submit(
+                    _generate_questions_cached,
+                    st.session_state.num_questions_selected,
+                    st.session_state.questions_complexity,
+                    display_role,
+                    st.session_state.generation_progress.append,
+                )
+
+        if display_role in role_cache:
+            checked_role_name = role_cache[display_role]
+        else:
+            # Wait for validation within a spinner (generation keeps running)
+            with st.spinner(f"Validating role name '{display_role}'..."):
+                 checked_role_name = st.session_state.role_check_future.result() # Returns string (original name), "", or None
+            if checked_role_name is not None: # Don't remember transient API errors
+                role_cache[display_role] = checked_role_name
+            else:
+                # Resubmit so the "try again" below really retries on the
+                # next rerun instead of re-reading this failed future forever
+                st.session_state.role_check_future = executor.submit(check_role, display_role)
 
         # --- Handle Validation Result ---
         placeholder.empty() # Clear the "Checking..." message
@@ -505,8 +715,28 @@ if st.session_state.interview_phase == 'setup':
         num_to_generate = st.session_state.num_questions_selected
         complexity_of_question = st.session_state.questions_complexity
 
+        generation_placeholder = st.empty()
         with st.spinner(f"AI is preparing {num_to_generate} {complexity_of_question} questions for a {final_role}..."):
-            st.session_state.questions = generate_questions_openai(num_to_generate, complexity_of_question, final_role)
+            # The speculative future was started alongside validation and is
+            # usually already done by the time the user clicks Start; while it
+            # is still streaming, show each question the moment it completes
+            future = st.session_state.questions_future
+            while not future.done():
+                ready = st.session_state.generation_progress
+                if ready:
+                    generation_placeholder.caption(
+                        f"Prepared {len(ready)} of {num_to_generate} questions. First up: {ready[0]}"
+                    )
+                time.sleep(0.2)
+            try:
+                st.session_state.questions = future.result()
+            except Exception as gen_err:
+                # The cached wrapper raises on empty/failed generation so the
+                # failure isn't cached; surface it via the error path below
+                log.warning("Question generation failed: %s", gen_err)
+                st.session_state.questions = []
+            st.session_state.speculative_key = None # Force fresh futures for the next setup pass
+        generation_placeholder.empty()
 
         if st.session_state.questions:
             # Initialize answers list, reset index, clear old results
@@ -520,6 +750,13 @@ if st.session_state.interview_phase == 'setup':
             # Error message is usually handled within generate_questions_openai
             st.error("Failed to generate interview questions. Please check the role or try again.")
 
+    # Escape hatch for users who want novelty: drop the cached set and
+    # speculative future so the next pass generates fresh questions
+    if effective_role_for_start and st.button("Regenerate Questions"):
+        _generate_questions_cached.clear()
+        st.session_state.speculative_key = None
+        st.rerun()
+
 
 # === Phase 2: Interviewing ===
 elif st.session_state.interview_phase == 'interviewing':
@@ -544,16 +781,17 @@ elif st.session_state.interview_phase == 'interviewing':
     st.subheader(f"{q_index+1}. {current_question}")
 
     # Text Area with Character Limit and Counter ---
+    # The widget key is the source of truth while typing; the answers list is
+    # only reconciled on navigation, so per-keystroke reruns skip the
+    # value-passing and write-back work entirely
+    answer_key = f"answer_{q_index}"
+    st.session_state.setdefault(answer_key, st.session_state.answers[q_index])
     answer = st.text_area(
         "Your Answer:",
-        key=f"answer_{q_index}",
-        value=st.session_state.answers[q_index], # Show previously entered answer
+        key=answer_key,
         height=250, # Adjusted height slightly
         max_chars=1000 # Set maximum character limit
     )
-    # Store the potentially truncated answer back into session state
-    # Streamlit handles the truncation automatically based on max_chars
-    st.session_state.answers[q_index] = answer
 
     # Display interactive character count
     char_count = len(answer)
@@ -561,6 +799,11 @@ elif st.session_state.interview_phase == 'interviewing':
     st.caption(f"Characters: {char_count} / 1000")
     # --- END OF MODIFICATION ---
 
+    # Copy the current widget value into the answers list; called only when a
+    # navigation button is pressed
+    def _save_current_answer():
+        st.session_state.answers[q_index] = st.session_state.get(answer_key, "")
+
     # Navigation buttons
     col1, col2, col3, col4 = st.columns([1, 1.5, 1, 1]) # Adjust ratios for button text length
 
@@ -568,6 +811,7 @@ elif st.session_state.interview_phase == 'interviewing':
         # "Previous" button - only show if not the first question
         if q_index > 0:
              if st.button("Previous"):
+                 _save_current_answer()
                  st.session_state.current_question_index -= 1
                  st.rerun()
         else:
@@ -580,8 +824,13 @@ elif st.session_state.interview_phase == 'interviewing':
          next_button_type = "primary" if is_last_question else "secondary"
 
          if st.button(next_button_label, type=next_button_type):
+             _save_current_answer()
              if is_last_question:
-                  # Move to evaluation phase
+                  # Move to evaluation phase; freeze questions/answers now
+                  # that editing is over — tuples are lighter to re-serialize
+                  # across reruns and hashable for st.cache_data keys
+                  st.session_state.questions = tuple(st.session_state.questions)
+                  st.session_state.answers = tuple(st.session_state.answers)
                   st.session_state.interview_phase = 'finished'
              else:
                   # Move to the next question
@@ -591,6 +840,9 @@ elif st.session_state.interview_phase == 'interviewing':
     with col3:
         # Button to end the interview early
         if st.button("End Early"):
+             _save_current_answer()
+             st.session_state.questions = tuple(st.session_state.questions)
+             st.session_state.answers = tuple(st.session_state.answers)
              st.session_state.interview_phase = 'finished'
              st.rerun()
 
@@ -600,57 +852,98 @@ elif st.session_state.interview_phase == 'finished':
     current_role = st.session_state.effective_role
     st.header(f"Interview Finished ({current_role})")
 
-    all_answers_safe = True
-    unsafe_indices = []
-    for i, answer in enumerate(st.session_state.answers):
-        if answer and answer.strip(): # Only check non-empty answers
-            is_safe = check_answer_safety(answer)
-            if is_safe is False: # Explicitly check for False (unsafe or unclear)
-                all_answers_safe = False
-                unsafe_indices.append(i)
-                st.warning(f"Warning: Answer to question {i+1} flagged as potentially unsafe.")
-                # Optionally: Replace the answer with a placeholder in the list sent for evaluation
-                st.session_state.answers[i] = "[Content Flagged as Unsafe]"
-            elif is_safe is None:
-                # Handle API error case if needed, maybe skip evaluation?
-                st.error(f"Could not verify safety for answer {i+1} due to an error.")
-                all_answers_safe = False # Treat error as potentially unsafe
-
-    if not all_answers_safe:
-        st.error("Some answers were flagged as potentially unsafe and may not be evaluated properly.")
-
-    # --- Trigger or Display Evaluation ---
-    st.subheader("AI Evaluation:")
-
-    # Check if evaluation results already exist in session state
+    # Pre-screen all answers in a single free moderation call; the grading
+    # prompt's safety rule remains the fallback for anything the endpoint
+    # misses. The whole scan (moderation, answer substitution, index
+    # extraction) runs exactly once per interview; every later rerun of this
+    # phase only re-renders from the stored indices.
+    if not st.session_state.get('finished_processed'):
+        verdicts = _check_answers_safety_cached(st.session_state.answers)
+        if None in verdicts:
+            # Drop only this entry so the failed moderation call doesn't
+            # stick for 24h; other sessions' cached verdicts stay intact
+            _check_answers_safety_cached.clear(st.session_state.answers)
+        # Substitute flagged answers in one vectorized scatter before
+        # evaluation sees them; flatnonzero gives the warning indices without
+        # another Python-level pass over the verdicts. The sanitized copy
+        # lives in display_answers — the originals stay untouched so they can
+        # be reviewed later and remain stable cache-key material
+        flagged = np.fromiter((v is False for v in verdicts), dtype=bool, count=len(verdicts))
+        unknown = np.fromiter((v is None for v in verdicts), dtype=bool, count=len(verdicts))
+        answers_arr = np.asarray(st.session_state.answers, dtype=object)
+        answers_arr[flagged] = "[Content Flagged as Unsafe]"
+        st.session_state.display_answers = tuple(answers_arr.tolist())
+        st.session_state.safety_results = verdicts
+        st.session_state.unsafe_indices = np.flatnonzero(flagged).tolist()
+        st.session_state.safety_unknown_indices = np.flatnonzero(unknown).tolist()
+        # Question headers never change once the interview is over; build the
+        # formatted strings once here instead of on every display rerun
+        st.session_state.q_headers = [
+            f"**Q{i+1}: {q}**" for i, q in enumerate(st.session_state.questions)
+        ]
+        st.session_state.finished_processed = True
+
+    # Strip each answer exactly once per rerun; the "any answers?" check and
+    # the display loop below reuse these instead of re-calling .strip().
+    # Everything downstream (evaluation, rendering) works off the sanitized
+    # copy, never the raw answers.
+    display_answers = st.session_state.display_answers
+    stripped_answers = [(a or '').strip() for a in display_answers]
+    answered_mask = [bool(s) for s in stripped_answers]
+    has_answers = any(answered_mask)
+    n_questions = len(st.session_state.questions)
+
+    # --- Trigger Evaluation (if needed) ---
+    # The sanitizing safety scan above is the only work that has to precede
+    # the evaluation call (it produces display_answers); everything visual —
+    # safety warnings, subheader, results — renders after the call returns,
+    # so the page stays minimal while the spinner is up.
     if st.session_state.evaluation_results is None:
         # If not evaluated yet, call the evaluation function
         # Check if there are actually answers to evaluate
-        if any(a and a.strip() for a in st.session_state.answers): # Check if any answer is non-empty
+        if has_answers: # Check if any answer is non-empty
+             progress_placeholder = st.empty()
              with st.spinner(f"AI is evaluating your answers for the {current_role} role... Please wait."):
-                 # Pass the actual role used for the interview
-                 st.session_state.evaluation_results = evaluate_answers_openai(
-                     st.session_state.questions,
-                     st.session_state.answers,
-                     st.session_state.num_questions_selected,
-                     current_role, # Pass the role context
-                 )
-                 # Check if evaluation actually returned results before rerunning
-                 if st.session_state.evaluation_results:
-                     st.rerun() # Rerun to display results now that they exist
-                 else:
-                     # If evaluation failed, error is shown by evaluate_answers_openai
-                     st.error("Failed to get evaluation results from the AI.")
+                 try:
+                     # Pass the actual role used for the interview
+                     st.session_state.evaluation_results = _eval_cached(
+                         current_role, # Pass the role context
+                         tuple(st.session_state.questions),
+                         tuple(display_answers),
+                         st.session_state.num_questions_selected,
+                         _on_progress=lambda done, total: progress_placeholder.caption(
+                             f"Evaluated {done} of {total} answers..."
+                         ),
+                     )
+                 except Exception as eval_err:
+                     # The cached wrapper raises on failure so nothing lands
+                     # in the disk cache; the underlying error is shown by
+                     # evaluate_answers_openai
+                     log.warning("Evaluation failed: %s", eval_err)
+                     st.session_state.evaluation_results = None
+             progress_placeholder.empty()
+             # No rerun needed: the display block below runs in this same
+             # script pass and picks the results straight out of session state
+             if not st.session_state.evaluation_results:
+                 st.error("Failed to get evaluation results from the AI.")
         else:
             st.warning("No answers were provided during the interview, so no evaluation can be performed.")
             # Create a default "no results" structure to prevent errors below
-            st.session_state.evaluation_results = {
-                "evaluations": [{"question_index": i, "grade": 1, "justification": "Not answered"} for i in range(len(st.session_state.questions))],
-                "overall_grade": 1,
-                "overall_justification": "No answers were provided for evaluation."
-            }
+            st.session_state.evaluation_results = _empty_eval(n_questions)
+
+    unsafe_indices = st.session_state.unsafe_indices
+    for i in unsafe_indices:
+        st.warning(f"Warning: Answer to question {i+1} flagged as potentially unsafe.")
+    for i in st.session_state.safety_unknown_indices:
+        # Verdict unknown (API error); the grading prompt's own safety
+        # rule is the fallback for these
+        st.error(f"Could not verify safety for answer {i+1} due to an error.")
+
+    if unsafe_indices or st.session_state.safety_unknown_indices:
+        st.error("Some answers were flagged as potentially unsafe and may not be evaluated properly.")
 
     # --- Display Evaluation Results (if available) ---
+    st.subheader("AI Evaluation:")
     if st.session_state.evaluation_results:
         eval_data = st.session_state.evaluation_results
 
@@ -659,55 +952,71 @@ elif st.session_state.interview_phase == 'finished':
         st.markdown(f"#### Overall Performance (for {current_role})")
 
         overall_grade = eval_data.get('overall_grade', 'N/A')
-        col_grade, col_feedback = st.columns([1, 3])
-        with col_grade:
-             # Ensure grade is displayed correctly even if N/A
-             grade_display = f"{overall_grade} / 10" if isinstance(overall_grade, int) else "N/A"
-             st.metric(label="Overall Grade", value=grade_display)
-        with col_feedback:
-             st.info(f"**Overall Feedback:** {eval_data.get('overall_justification', 'No overall feedback provided.')}")
+        if isinstance(overall_grade, int):
+            col_grade, col_feedback = st.columns([1, 3])
+            with col_grade:
+                 st.metric(label="Overall Grade", value=f"{overall_grade} / 10")
+            with col_feedback:
+                 st.info(f"**Overall Feedback:** {eval_data.get('overall_justification', 'No overall feedback provided.')}")
+        else:
+            # No numeric grade to show — skip the columns/metric widgets and
+            # emit the feedback on its own
+            st.info(f"**Overall Feedback:** {eval_data.get('overall_justification', 'No overall feedback provided.')}")
         st.markdown("---")
 
         # Display Detailed Feedback per Question
         st.subheader("Detailed Feedback per Question:")
         evaluations_list = eval_data.get('evaluations', [])
 
-        if len(evaluations_list) == len(st.session_state.questions):
-             for i, question in enumerate(st.session_state.questions):
-                 st.markdown(f"**Q{i+1}: {question}**")
-                 answer = st.session_state.answers[i] if i < len(st.session_state.answers) else ""
-                 # Use an expander for cleaner look, default to collapsed unless not answered
-                 is_answered = answer and answer.strip()
-                 with st.expander(f"Your Answer & AI Feedback (Q{i+1})", expanded=(not is_answered)):
-                    st.markdown(f"> _Your Answer: {answer if is_answered else '(Not answered)'}_")
-
-                    # Ensure evaluation exists for index i
-                    if i < len(evaluations_list):
-                        evaluation = evaluations_list[i]
-                        grade = evaluation.get('grade')
-                        justification = evaluation.get('justification')
-
-                        if grade is not None and justification:
-                            # Use columns for grade and justification
-                            fb_col1, fb_col2 = st.columns([1, 4])
-                            with fb_col1:
-                                st.metric(label="Grade", value=f"{grade}/10")
-                            with fb_col2:
-                                # Apply different styling based on grade or justification
-                                if grade <= 1 and justification in ["Not answered", "Inappropriate or irrelevant content"]:
-                                    st.warning(f"**AI Feedback:** {justification}")
-                                elif grade < 5:
-                                    st.warning(f"**AI Feedback:** {justification}")
-                                else:
-                                    st.success(f"**AI Feedback:** {justification}")
-                        else:
-                            st.warning("Evaluation data (grade/justification) missing for this question.")
-                    else:
-                        st.warning("Evaluation data missing for this question index.")
-                 st.divider() # Add a visual separator between questions
+        if len(evaluations_list) == n_questions:
+          # Default to a single virtualized st.dataframe: one widget for the
+          # whole table instead of a widget subtree per question, so render
+          # cost no longer grows with the number of questions. The per-
+          # question layout remains available behind a toggle.
+          classic_view = st.toggle("Classic per-question view", key="classic_feedback_view")
+          if not classic_view:
+             summary_df = pd.DataFrame({
+                 'Q': range(1, n_questions + 1),
+                 'Question': list(st.session_state.questions),
+                 'Your Answer': list(display_answers),
+                 'Grade': [e.get('grade') for e in evaluations_list],
+                 'Feedback': [e.get('justification') for e in evaluations_list],
+             })
+             st.dataframe(
+                 summary_df,
+                 use_container_width=True,
+                 hide_index=True,
+                 column_config={
+                     'Grade': st.column_config.ProgressColumn(
+                         min_value=0, max_value=10, format="%d/10"
+                     ),
+                 },
+             )
+          else:
+             # Classic view as one joined string and a single st.markdown
+             # emit: N questions cost one widget/protobuf message instead of
+             # several per question (header, answer, grade, divider)
+             sections = []
+             for i, header in enumerate(st.session_state.q_headers):
+                 # Index validity is guaranteed by the equality check above,
+                 # so no per-iteration bounds re-checks
+                 answer = display_answers[i]
+                 is_answered = answered_mask[i]
+                 grade, justification = _grade_and_justification(evaluations_list[i])
+                 if grade is not None and justification:
+                     icon = "⚠️" if grade < 5 else "✅"
+                     grade_line = f"{icon} **Grade: {grade}/10** — {justification}"
+                 else:
+                     grade_line = "_Evaluation data (grade/justification) missing for this question._"
+                 sections.append(
+                     f"{header}\n\n"
+                     f"> _Your Answer: {answer if is_answered else '(Not answered)'}_\n\n"
+                     f"{grade_line}"
+                 )
+             st.markdown("\n\n---\n\n".join(sections))
         else:
             st.error("Mismatch between the number of questions and the number of evaluations received. Cannot display detailed feedback reliably.")
-            print(f"Data mismatch: {len(st.session_state.questions)} questions, {len(evaluations_list)} evaluations.")
+            log.warning("Data mismatch: %d questions, %d evaluations.", len(st.session_state.questions), len(evaluations_list))
 
     else:
         # This case might be hit if evaluation failed critically after the spinner
@@ -722,10 +1031,19 @@ elif st.session_state.interview_phase == 'finished':
         st.session_state.answers = []
         st.session_state.current_question_index = 0
         st.session_state.evaluation_results = None
+        st.session_state.pop('display_answers', None)
+        st.session_state.pop('q_headers', None)
+        st.session_state.pop('safety_results', None)
+        st.session_state.pop('unsafe_indices', None)
+        st.session_state.pop('safety_unknown_indices', None)
+        st.session_state.finished_processed = False
         st.session_state.selected_option = 'App Developer'
         st.session_state.custom_role_input = ''
         st.session_state.effective_role = 'App Developer'
         st.session_state.num_questions_selected = 3
+        # Drop the per-question text-area keys so old answers don't resurface
+        for key in [k for k in st.session_state if k.startswith('answer_')]:
+            del st.session_state[key]
         st.rerun()
 
 # --- Simple Sidebar Info ---